@@ -1,19 +1,30 @@
-import asyncio
 import os
 import sys
+from pathlib import Path
 
 from .bot import EnergyBot
 
+try:
+    # libuv-based event loop, lower per-request overhead when installed
+    from uvloop import run as run_async
+except ImportError:
+    from asyncio import run as run_async
+
 
 def load_env():
-    """Load environment variables from a .env file if it exists."""
-    env_path = ".env"
-    if os.path.exists(env_path):
-        with open(env_path, encoding="utf8") as f:
-            for line in f:
-                if line.strip() and not line.startswith("#"):
-                    key, value = line.strip().split("=", 1)
-                    os.environ[key] = value
+    """Load environment variables from a .env file if it exists.
+
+    Variables already set in the environment take precedence.
+    """
+    env_path = Path(".env")
+    if not env_path.exists():
+        return
+    for line in env_path.read_text(encoding="utf8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        key, _, value = line.partition("=")
+        os.environ.setdefault(key, value)
 
 
 async def main():
@@ -53,7 +64,7 @@ async def main():
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        run_async(main())
     except KeyboardInterrupt:
         print("\n⚠️ Interrupted by user")
         sys.exit(1)
@@ -4,15 +4,21 @@ Automates the clicking game at https://cgj.bpaul.fr/game/energy
 """
 
 import asyncio
-import json as json_module
-import re
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from datetime import datetime, timedelta
 from typing import Optional
 import math
 import random
+import time
 
 import httpx
+from selectolax.lexbor import LexborHTMLParser
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 HUMAN_CONSTANTS = {
     "k": 100,
@@ -31,6 +37,30 @@ def is_night_time() -> bool:
     return hour < 6
 
 
+def _build_human_tables(
+    size: int = 4096,
+) -> tuple[tuple[float, ...], tuple[float, ...]]:
+    """Precompute the humaniser delay curve over [a, b] (day and night tables)."""
+    k, t, u, a, b, min_to_drop = (
+        HUMAN_CONSTANTS["k"],
+        HUMAN_CONSTANTS["t"],
+        HUMAN_CONSTANTS["u"],
+        HUMAN_CONSTANTS["a"],
+        HUMAN_CONSTANTS["b"],
+        HUMAN_CONSTANTS["min_to_drop"],
+    )
+
+    step = (b - a) / (size - 1)
+    day = tuple(
+        k * (u**x + 1) / (math.exp(x) * t) for x in (a + i * step for i in range(size))
+    )
+    night = tuple(l for l in day if l >= min_to_drop)
+    return day, night
+
+
+_HUMAN_TABLE, _HUMAN_NIGHT_TABLE = _build_human_tables()
+
+
 def humaniser():
     """Get an human delay that respect day/night cycle
 
@@ -39,16 +69,7 @@ def humaniser():
     """
     if is_night_time():
         return humaniser_night()
-    k, t, u, a, b = (
-        HUMAN_CONSTANTS["k"],
-        HUMAN_CONSTANTS["t"],
-        HUMAN_CONSTANTS["u"],
-        HUMAN_CONSTANTS["a"],
-        HUMAN_CONSTANTS["b"],
-    )
-
-    x = random.uniform(a, b)
-    return k * (u**x + 1) / (math.exp(x) * t)
+    return random.choice(_HUMAN_TABLE)
 
 
 def humaniser_night():
@@ -57,20 +78,7 @@ def humaniser_night():
     Returns:
         float: delay in seconds
     """
-    k, t, u, a, b, min_to_drop = (
-        HUMAN_CONSTANTS["k"],
-        HUMAN_CONSTANTS["t"],
-        HUMAN_CONSTANTS["u"],
-        HUMAN_CONSTANTS["a"],
-        HUMAN_CONSTANTS["b"],
-        HUMAN_CONSTANTS["min_to_drop"],
-    )
-
-    l = 0
-    while l < min_to_drop:
-        x = random.uniform(a, b)
-        l = k * (u**x + 1) / (math.exp(x) * t)
-    return l
+    return random.choice(_HUMAN_NIGHT_TABLE)
 
 
 def delta_to_date(date_str: str) -> timedelta:
@@ -78,9 +86,8 @@ def delta_to_date(date_str: str) -> timedelta:
     Return the timedelta between now (UTC) and the given date.
     Positive means the given date is in the future.
     """
-    target = datetime.fromisoformat(date_str)
-    now = datetime.now(timezone.utc)
-    return target - now
+    target = datetime.fromisoformat(date_str).timestamp()
+    return timedelta(seconds=target - time.time())
 
 
 def extract_next_click_time(html: str) -> Optional[timedelta]:
@@ -89,26 +96,29 @@ def extract_next_click_time(html: str) -> Optional[timedelta]:
     Parses the data-counter-events-value attribute.
     Returns timedelta until next click, or None if not found or available now.
     """
-    # Find the counter element (handle multiline with DOTALL flag)
-    match = re.search(
-        r'data-controller="counter"\s+data-counter-events-value="([^"]*(?:\n[^"]*)*)"',
-        html,
-        re.DOTALL,
-    )
-    if not match:
+    node = LexborHTMLParser(html).css_first('[data-controller="counter"]')
+    if node is None:
         # No counter element means the click is available now
         return timedelta(0)
 
+    # Attribute values come back with HTML entities already decoded
+    json_str = node.attributes.get("data-counter-events-value")
+    if not json_str:
+        return timedelta(0)
+
+    return parse_counter_events(json_str)
+
+
+@lru_cache(maxsize=16)
+def parse_counter_events(json_str: str) -> timedelta:
+    """
+    Return the cooldown described by a counter events JSON payload.
+    Cached: a state fetch after a failed click usually sees the same payload
+    as the last click response, fresh cooldowns always miss.
+    """
     try:
-        # Get the JSON value (with HTML entities)
-        json_str = match.group(1)
-        # Decode HTML entities
-        json_str = json_str.replace("&quot;", '"')
-        # Remove newlines
-        json_str = json_str.replace("\n", "")
-
-        # Parse the JSON array
-        events = json_module.loads(json_str)
+        # Parse the JSON array (newlines are plain JSON whitespace)
+        events = json_loads(json_str)
         if not events or len(events) == 0:
             # No events means click is available
             return timedelta(0)
@@ -135,7 +145,7 @@ def extract_next_click_time(html: str) -> Optional[timedelta]:
 
         return timeout_duration
 
-    except (json_module.JSONDecodeError, KeyError, ValueError) as e:
+    except (KeyError, ValueError) as e:
         print(f"Error parsing counter events: {e}")
         # If error, assume click is available
         return timedelta(0)
@@ -150,14 +160,25 @@ class GameSession:
     base_url: str = "https://cgj.bpaul.fr"
     cookies: Optional[httpx.Cookies] = None
     client: Optional[httpx.AsyncClient] = None
+    next_click_in_seconds: Optional[float] = None
     ua = (
         "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:145.0) Gecko/20100101 Firefox/145.0"
     )
 
     async def __aenter__(self):
         """Async context manager entry."""
+        # Keep connections alive (and multiplexed over HTTP/2) so every
+        # request after the login skips the TCP/TLS handshake
         self.client = httpx.AsyncClient(
-            follow_redirects=True, headers={"User-Agent": self.ua}
+            follow_redirects=True,
+            http2=True,
+            limits=httpx.Limits(
+                max_keepalive_connections=4,
+                max_connections=8,
+                keepalive_expiry=60.0,
+            ),
+            timeout=httpx.Timeout(10.0, connect=5.0),
+            headers={"User-Agent": self.ua},
         )
         return self
 
@@ -184,10 +205,10 @@ class GameSession:
             response.raise_for_status()
 
             # Extract CSRF token from the login page HTML
-            csrf_match = re.search(
-                r'name="_csrf_token"\s+value="([^"]*)"', response.text
+            node = LexborHTMLParser(response.text).css_first(
+                'input[name="_csrf_token"]'
             )
-            csrf_token = csrf_match.group(1) if csrf_match else None
+            csrf_token = node.attributes.get("value") if node else None
 
             # Prepare login data
             login_data = {
@@ -220,7 +241,10 @@ class GameSession:
     async def click(self) -> bool:
         """
         Perform a click action on the energy game.
-        Returns True if click was successful, False otherwise.
+        Returns True if click was successful, False otherwise (including when
+        the request is redirected away from the game page).
+        The cooldown reported by the redirected page is stored in
+        next_click_in_seconds.
         """
         if not self.client:
             raise RuntimeError(
@@ -228,6 +252,7 @@ class GameSession:
             )
 
         action_url = f"{self.base_url}/game/energy/action"
+        self.next_click_in_seconds = None
 
         try:
             response = await self.client.post(
@@ -238,6 +263,16 @@ class GameSession:
             )
             response.raise_for_status()
 
+            if not response.url.path.endswith("/game/energy"):
+                # Redirected away (e.g. to the login page), the click did not count
+                print(f"Click not applied, redirected to {response.url.path}")
+                return False
+
+            # The action redirects back to the game page, reuse its cooldown
+            next_click_delta = extract_next_click_time(response.text)
+            if next_click_delta is not None:
+                self.next_click_in_seconds = next_click_delta.total_seconds()
+
             return response.status_code in (200, 302)
 
         except httpx.RequestError as e:
@@ -260,6 +295,16 @@ class GameSession:
             response = await self.client.get(game_url)
             response.raise_for_status()
 
+            if not response.url.path.endswith("/game/energy"):
+                # Redirected away (e.g. to the login page), nothing to parse
+                print(f"Game state unavailable, redirected to {response.url.path}")
+                return {
+                    "timestamp": datetime.now().isoformat(),
+                    "status_code": response.status_code,
+                    "url": str(response.url),
+                    "next_click_in_seconds": None,
+                }
+
             # Extract next click time from HTML
             next_click_delta = extract_next_click_time(response.text)
             next_click_seconds = (
@@ -290,6 +335,7 @@ class EnergyBot:
         self.base_url = base_url
         self.click_count = 0
         self.session: Optional[GameSession] = None
+        self._next_click_at: Optional[float] = None
 
         if not self.email or not self.password:
             raise ValueError("Email and password must be provided for the bot.")
@@ -323,14 +369,21 @@ class EnergyBot:
 
             print(f"✓ Login successful for {self.email}")
 
-            # Get initial game state
-            state = await session.get_game_state()
-            if state:
-                print(f"✓ Game state retrieved")
-                if state.get("next_click_in_seconds") is not None:
-                    next_click = state["next_click_in_seconds"]
-                    if next_click > 0:
-                        print(f"  Next click available in {next_click:.2f}s")
+            monotonic = asyncio.get_running_loop().time
+            self._next_click_at = None
+
+            # Get initial game state, unless the configured interval drives the
+            # wait (the first loop iteration fetches it anyway)
+            if not click_interval or click_interval <= 0:
+                state = await session.get_game_state()
+                if state:
+                    print(f"✓ Game state retrieved")
+                    if state.get("next_click_in_seconds") is not None:
+                        next_click = state["next_click_in_seconds"]
+                        # Seed the loop so it does not fetch the state again
+                        self._next_click_at = monotonic() + next_click
+                        if next_click > 0:
+                            print(f"  Next click available in {next_click:.2f}s")
 
             # Start clicking loop
             if click_interval is not None:
@@ -338,29 +391,41 @@ class EnergyBot:
             else:
                 print("Starting to click (using server's dynamic timeouts)...")
 
-            start_time = asyncio.get_event_loop().time()
+            start_time = monotonic()
+
+            # Local aliases for the hot loop
+            get_state = session.get_game_state
+            do_click = session.click
+            sleep = asyncio.sleep
+            humanise = humaniser
+            count = self.click_count
 
             try:
                 while True:
                     # Check if we've reached max clicks
-                    if max_clicks and self.click_count >= max_clicks:
+                    if max_clicks and count >= max_clicks:
                         print(f"Reached max clicks limit ({max_clicks})")
                         break
 
                     # Check if we've exceeded duration
                     if duration:
-                        elapsed = asyncio.get_event_loop().time() - start_time
+                        elapsed = monotonic() - start_time
                         if elapsed >= duration:
                             print(f"Reached duration limit ({duration}s)")
                             break
 
-                    # Fetch game state to get server's dynamic timeout
-                    state = await session.get_game_state()
                     server_wait_time: float = 0
-                    if state and state.get("next_click_in_seconds"):
-                        server_wait_time = max(0, state["next_click_in_seconds"])
+                    if self._next_click_at is not None:
+                        # Cooldown already known from the last click response
+                        now = monotonic()
+                        server_wait_time = max(0, self._next_click_at - now)
+                    else:
+                        # Fetch game state to get server's dynamic timeout
+                        state = await get_state()
+                        if state and state.get("next_click_in_seconds") is not None:
+                            server_wait_time = max(0, state["next_click_in_seconds"])
 
-                    human_delay = humaniser()
+                    human_delay = humanise()
                     print(f"Humanizer delay: {human_delay:.2f}s")
                     server_wait_time += human_delay
 
@@ -375,23 +440,30 @@ class EnergyBot:
 
                     # Wait before clicking
                     if wait_time > 0:
-                        await asyncio.sleep(wait_time)
+                        await sleep(wait_time)
 
                     # Perform click
-                    success = await session.click()
+                    success = await do_click()
                     if success:
-                        self.click_count += 1
-                        if self.click_count % 10 == 0:
-                            print(f"Clicks: {self.click_count}")
+                        count += 1
+                        if count % 10 == 0:
+                            print(f"Clicks: {count}")
                     else:
                         print("Click failed, retrying...")
-                        pass
+
+                    next_click = session.next_click_in_seconds
+                    if success and next_click is not None:
+                        self._next_click_at = monotonic() + next_click
+                    else:
+                        # Unknown cooldown, force a state fetch next iteration
+                        self._next_click_at = None
 
             except KeyboardInterrupt:
                 print("\nBot interrupted by user")
 
             finally:
-                elapsed = asyncio.get_event_loop().time() - start_time
+                self.click_count = count
+                elapsed = monotonic() - start_time
                 print(
                     f"\nBot finished. Total clicks: {self.click_count} in {elapsed:.2f}s"
                 )
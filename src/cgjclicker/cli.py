@@ -2,7 +2,6 @@
 CLI interface for the Energy Game Bot.
 """
 
-import asyncio
 import sys
 from pathlib import Path
 
@@ -13,6 +12,12 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from cgjclicker.bot import EnergyBot
 
+try:
+    # libuv-based event loop, lower per-request overhead when installed
+    from uvloop import run as run_async
+except ImportError:
+    from asyncio import run as run_async
+
 
 @click.group()
 def cli():
@@ -65,7 +70,7 @@ def start(
     bot = EnergyBot(email=email, password=password, base_url=url)
 
     try:
-        asyncio.run(
+        run_async(
             bot.run(click_interval=interval, max_clicks=max_clicks, duration=duration)
         )
     except KeyboardInterrupt: